@@ -2,64 +2,104 @@
 Command parsing and handling
 """
 
+import sys
+
+# Command mappings with abbreviations
+_COMMANDS = {
+    'look': ('look', 'l'),
+    'move': ('move', 'm', 'go'),
+    'grab': ('grab', 'g', 'take', 'get'),
+    'inventory': ('inventory', 'i', 'inv'),
+    'fight': ('fight', 'f', 'attack', 'battle')
+}
+
+# Direction mappings
+_DIRECTIONS = {
+    'north': ('north', 'n'),
+    'south': ('south', 's'),
+    'east': ('east', 'e'),
+    'west': ('west', 'w')
+}
+
+# Reverse alias indexes for O(1) lookups; canonical names are interned so
+# parse() results compare and hash by identity in dispatch lookups
+_CMD_INDEX = {alias: sys.intern(cmd) for cmd, aliases in _COMMANDS.items() for alias in aliases}
+_DIR_INDEX = {alias: sys.intern(direction) for direction, aliases in _DIRECTIONS.items() for alias in aliases}
+
+# Commands that take a direction as their subcommand
+_DIRECTIONAL_COMMANDS = frozenset(('look', 'move'))
+
+# Commands whose argument is resolved to a known item name
+_ITEM_COMMANDS = frozenset(('grab',))
+
+# Trie node key holding {kind: canonical} for words ending at that node
+_ACCEPT = '_accept'
+
+def _trie_insert(trie, word, kind, value):
+    """Add a word to the trie, tagging its final node with kind -> value"""
+    node = trie
+    for char in word:
+        node = node.setdefault(char, {})
+    node.setdefault(_ACCEPT, {})[kind] = value
+
+def _trie_match(trie, text, kind):
+    """Find the longest word of a kind at the start of text, ending on a word boundary"""
+    node = trie
+    match, end = None, 0
+    for i, char in enumerate(text):
+        if char == ' ' and kind in node.get(_ACCEPT, ()):
+            match, end = node[_ACCEPT][kind], i
+        node = node.get(char)
+        if node is None:
+            return match, end
+    if kind in node.get(_ACCEPT, ()):
+        match, end = node[_ACCEPT][kind], len(text)
+    return match, end
+
 class CommandParser:
-    def __init__(self):
-        # Command mappings with abbreviations
-        self.commands = {
-            'look': ['look', 'l'],
-            'move': ['move', 'm', 'go'],
-            'grab': ['grab', 'g', 'take', 'get'],
-            'inventory': ['inventory', 'i', 'inv'],
-            'fight': ['fight', 'f', 'attack', 'battle']
-        }
+    def __init__(self, item_names=()):
+        self.commands = _COMMANDS
+        self.directions = _DIRECTIONS
         
-        # Direction mappings
-        self.directions = {
-            'north': ['north', 'n'],
-            'south': ['south', 's'],
-            'east': ['east', 'e'],
-            'west': ['west', 'w']
-        }
+        # Single trie over command aliases, direction aliases and item names
+        self._trie = {}
+        for alias, cmd in _CMD_INDEX.items():
+            _trie_insert(self._trie, alias, 'command', cmd)
+        for alias, direction in _DIR_INDEX.items():
+            _trie_insert(self._trie, alias, 'direction', direction)
+        for name in item_names:
+            _trie_insert(self._trie, ' '.join(name.lower().split()), 'item', name)
     
     def parse(self, user_input):
-        """Parse user input into command, subcommand, and arguments"""
+        """Parse lowercased user input into command, subcommand, and arguments"""
         if not user_input:
             return None, None, None
             
-        parts = user_input.lower().strip().split()
-        if not parts:
+        text = ' '.join(user_input.split())
+        if not text:
             return None, None, None
             
         # Find command
-        command = self._find_command(parts[0])
+        command, end = _trie_match(self._trie, text, 'command')
         if not command:
             return None, None, None
             
         # Parse subcommand and arguments
         subcommand = None
         args = None
+        rest = text[end + 1:]
         
-        if len(parts) > 1:
-            # Check if second part is a direction
-            direction = self._find_direction(parts[1])
-            if direction and command in ['look', 'move']:
+        if rest:
+            # Check if the rest starts with a direction
+            direction, _ = _trie_match(self._trie, rest, 'direction')
+            if direction and command in _DIRECTIONAL_COMMANDS:
                 subcommand = direction
             else:
-                # Treat as argument
-                args = ' '.join(parts[1:])
+                # Treat as argument; an exact item name resolves to the item's own name
+                args = rest
+                if command in _ITEM_COMMANDS:
+                    item, end = _trie_match(self._trie, rest, 'item')
+                    if end == len(rest):
+                        args = item
         
         return command, subcommand, args
-    
-    def _find_command(self, input_cmd):
-        """Find command from input (including abbreviations)"""
-        for cmd, aliases in self.commands.items():
-            if input_cmd in aliases:
-                return cmd
-        return None
-    
-    def _find_direction(self, input_dir):
-        """Find direction from input (including abbreviations)"""
-        for direction, aliases in self.directions.items():
-            if input_dir in aliases:
-                return direction
-        return None
\ No newline at end of file
@@ -6,32 +6,96 @@ from player import Player
 from world import World
 from commands import CommandParser
 from ollama_client import OllamaClient
-from items import ItemManager
+from items import ItemManager, Weapon
+
+_QUIT_WORDS = frozenset(('quit', 'exit', 'q'))
+_HELP_WORDS = frozenset(('help', 'h', '?'))
+
+_FIGHT_TMPL = """
+        The player is fighting a {target} in {room_name}. 
+        The room description: {room_description}
+        Player inventory: {inventory}
+        {weapon_text}
+        
+        Generate a short, exciting fight outcome (2-3 sentences). 
+        Make it adventurous but not too violent.
+        """
+
+_HELP_TEXT = """
+🎮 GAME COMMANDS:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+📍 LOOK (l)          - Look around current room
+   look <direction>  - Look in specific direction (n/s/e/w)
+
+🚶 MOVE (m)          - Move in a direction
+   move <direction>  - Move north/south/east/west (n/s/e/w)
+
+🤏 GRAB (g)          - Pick up an item
+   grab <item>       - Grab specific item
+
+🎒 INVENTORY (i)     - Show your inventory
+
+🔧 USE (u)           - Use an item from inventory
+   use <item>        - Use specific item
+
+🔍 EXAMINE (x)       - Examine an item in detail
+   examine <item>    - Get detailed item information
+
+⚔️ FIGHT (f)         - Fight an enemy
+   fight <enemy>     - Fight specific enemy
+
+❓ HELP (h)          - Show this help
+🚪 QUIT (q)          - Exit game
+
+💡 TIP: You can use abbreviations! 
+   'm n' = 'move north', 'l e' = 'look east', etc.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        """
 
 class GameEngine:
     def __init__(self, logger):
         self.logger = logger
         self.player = Player()
         self.world = World()
-        self.command_parser = CommandParser()
-        self.ollama_client = OllamaClient(logger)
         self.item_manager = ItemManager()
+        self.command_parser = CommandParser(
+            item.name for item in self.item_manager.get_all_items().values())
+        self.ollama_client = OllamaClient(logger)
+        
+        # Command dispatch table; handlers take (subcommand, args)
+        self._dispatch = {
+            "look": lambda subcommand, args: self._handle_look(subcommand),
+            "move": lambda subcommand, args: self._handle_move(subcommand),
+            "grab": lambda subcommand, args: self._handle_grab(args),
+            "inventory": lambda subcommand, args: self._handle_inventory(),
+            "use": lambda subcommand, args: self._handle_use(args),
+            "examine": lambda subcommand, args: self._handle_examine(args),
+            "fight": lambda subcommand, args: self._handle_fight(args)
+        }
+        
+        # Rendered "look" output per room, invalidated when room items change
+        self._look_cache = {}
         
         # Place player in starting room
         self.player.current_room = "forest_entrance"
+        self._current_room_obj = self.world.get_room(self.player.current_room)
         
-        # Show initial room description
-        self._show_room_description()
-        
+    def _cur_room(self):
+        """Get the room the player is currently in"""
+        return self._current_room_obj
+    
     def process_command(self, user_input):
         """Process user command and return result"""
-        if user_input.lower() in ['quit', 'exit', 'q']:
+        lowered = user_input.lower()
+        if lowered in _QUIT_WORDS:
             return "QUIT"
-        elif user_input.lower() in ['help', 'h', '?']:
+        elif lowered in _HELP_WORDS:
             return "HELP"
             
         # Parse command
-        command, subcommand, args = self.command_parser.parse(user_input)
+        command, subcommand, args = self.command_parser.parse(lowered)
         
         if not command:
             return "❓ I don't understand that command. Type 'help' for available commands."
@@ -41,23 +105,12 @@ class GameEngine:
     
     def _execute_command(self, command, subcommand, args):
         """Execute parsed command"""
+        handler = self._dispatch.get(command)
+        if not handler:
+            return f"❓ Unknown command: {command}"
+            
         try:
-            if command == "look":
-                return self._handle_look(subcommand)
-            elif command == "move":
-                return self._handle_move(subcommand)
-            elif command == "grab":
-                return self._handle_grab(args)
-            elif command == "inventory":
-                return self._handle_inventory()
-            elif command == "use":
-                return self._handle_use(args)
-            elif command == "examine":
-                return self._handle_examine(args)
-            elif command == "fight":
-                return self._handle_fight(args)
-            else:
-                return f"❓ Unknown command: {command}"
+            return handler(subcommand, args)
                 
         except Exception as e:
             self.logger.log(f"Command execution error: {str(e)}")
@@ -65,32 +118,36 @@ class GameEngine:
     
     def _handle_look(self, direction=None):
         """Handle look command"""
-        current_room = self.world.get_room(self.player.current_room)
+        current_room = self._cur_room()
         
         if not direction:
             # Look around current room
-            result = f"🏠 {current_room['name']}\n"
-            result += f"📝 {current_room['description']}\n"
+            cached = self._look_cache.get(self.player.current_room)
+            if cached is not None:
+                return cached
+                
+            parts = [f"🏠 {current_room['name']}", f"📝 {current_room['description']}"]
             
             # Show items
             if current_room.get('items'):
-                result += f"📦 Items here: {', '.join(current_room['items'])}\n"
+                parts.append(f"📦 Items here: {', '.join(current_room['items'])}")
                 
             # Show exits
-            exits = [direction for direction in ['north', 'south', 'east', 'west'] 
-                    if current_room.get('exits', {}).get(direction)]
+            exits = self.world.get_exits(self.player.current_room)
             if exits:
-                result += f"🚪 Exits: {', '.join(exits)}"
+                parts.append(f"🚪 Exits: {', '.join(exits)}")
             else:
-                result += "🚪 No obvious exits"
+                parts.append("🚪 No obvious exits")
                 
+            result = "\n".join(parts)
+            self._look_cache[self.player.current_room] = result
             return result
         else:
             # Look in specific direction
             exit_room = current_room.get('exits', {}).get(direction)
             if exit_room:
                 target_room = self.world.get_room(exit_room)
-                return f"👀 To the {direction}: {target_room['name']} - {target_room.get('short_desc', 'A mysterious area')}"
+                return f"👀 To the {direction}: {target_room.get('name', 'Unknown area')} - {target_room.get('short_desc', 'A mysterious area')}"
             else:
                 return f"👀 You see nothing interesting to the {direction}."
     
@@ -99,7 +156,7 @@ class GameEngine:
         if not direction:
             return "🚶 Move where? Specify a direction (north, south, east, west)"
             
-        current_room = self.world.get_room(self.player.current_room)
+        current_room = self._cur_room()
         exit_room = current_room.get('exits', {}).get(direction)
         
         if not exit_room:
@@ -107,6 +164,7 @@ class GameEngine:
             
         # Move player
         self.player.current_room = exit_room
+        self._current_room_obj = self.world.get_room(exit_room)
         self.logger.log(f"Player moved {direction} to {exit_room}")
         
         # Show new room description
@@ -117,22 +175,16 @@ class GameEngine:
         if not item_name:
             return "🤏 Grab what? Specify an item name."
             
-        current_room = self.world.get_room(self.player.current_room)
-        room_items = current_room.get('items', [])
-        
         # Find item (case insensitive)
-        item_to_grab = None
-        for item in room_items:
-            if item.lower() == item_name.lower():
-                item_to_grab = item
-                break
+        item_to_grab = self.world.find_item(self.player.current_room, item_name)
                 
         if not item_to_grab:
             return f"📦 There's no '{item_name}' here to grab."
             
         # Add to inventory and remove from room
-        self.player.inventory.append(item_to_grab)
-        room_items.remove(item_to_grab)
+        self.player.add_item(item_to_grab)
+        self.world.remove_item(self.player.current_room, item_to_grab)
+        self._look_cache.pop(self.player.current_room, None)
         
         self.logger.log(f"Player grabbed: {item_to_grab}")
         return f"✅ You grabbed the {item_to_grab}!"
@@ -142,25 +194,27 @@ class GameEngine:
         if not self.player.inventory:
             return "🎒 Your inventory is empty."
             
-        result = "🎒 Inventory:\n"
-        for item in self.player.inventory:
+        lines = ["🎒 Inventory:"]
+        for item, count in self.player.inventory.items():
+            label = f"{item} (x{count})" if count > 1 else item
             item_obj = self.item_manager.get_item(item)
             if item_obj:
-                result += f"  • {item} - {item_obj.description[:50]}...\n"
+                lines.append(f"  • {label} - {item_obj.description[:50]}...")
             else:
-                result += f"  • {item}\n"
+                lines.append(f"  • {label}")
         
-        return result.rstrip()
+        return "\n".join(lines)
     
     def _handle_use(self, item_name):
         """Handle use command"""
         if not item_name:
             return "🔧 Use what? Specify an item name."
             
-        if not self.player.has_item(item_name):
+        name_lc = item_name.lower()
+        if not self.player.has_item(name_lc):
             return f"❌ You don't have '{item_name}' in your inventory."
             
-        item = self.item_manager.get_item(item_name)
+        item = self.item_manager.get_item_exact(name_lc)
         if not item:
             return f"❓ Unknown item: {item_name}"
             
@@ -184,24 +238,21 @@ class GameEngine:
             return "🔍 Examine what? Specify an item name."
             
         # Check if item is in inventory
-        if self.player.has_item(item_name):
-            description = self.item_manager.get_item_description(item_name)
+        name_lc = item_name.lower()
+        if self.player.has_item(name_lc):
+            description = self.item_manager.get_item_description(name_lc)
             if description:
                 return f"🔍 {description}"
             else:
                 return f"❓ You can't find details about '{item_name}'."
         
         # Check if item is in current room
-        current_room = self.world.get_room(self.player.current_room)
-        room_items = current_room.get('items', [])
-        
-        for item in room_items:
-            if item.lower() == item_name.lower():
-                description = self.item_manager.get_item_description(item_name)
-                if description:
-                    return f"🔍 {description}"
-                else:
-                    return f"❓ You can't find details about '{item_name}'."
+        if self.world.has_item(self.player.current_room, name_lc):
+            description = self.item_manager.get_item_description(name_lc)
+            if description:
+                return f"🔍 {description}"
+            else:
+                return f"❓ You can't find details about '{item_name}'."
         
         return f"❌ There's no '{item_name}' here or in your inventory."
     
@@ -210,7 +261,7 @@ class GameEngine:
         if not target:
             return "⚔️ Fight what? You need to specify a target."
             
-        current_room = self.world.get_room(self.player.current_room)
+        current_room = self._cur_room()
         
         # Check if there are enemies in the room
         enemies = current_room.get('enemies', [])
@@ -221,7 +272,7 @@ class GameEngine:
         weapons = []
         for item_name in self.player.inventory:
             item = self.item_manager.get_item(item_name)
-            if item and hasattr(item, 'damage'):
+            if isinstance(item, Weapon):
                 weapons.append(item)
         
         weapon_text = ""
@@ -229,23 +280,40 @@ class GameEngine:
             weapon_text = f" You are wielding: {', '.join([w.name for w in weapons])}"
         
         # Use AI to generate fight scenario
-        fight_prompt = f"""
-        The player is fighting a {target} in {current_room['name']}. 
-        The room description: {current_room['description']}
-        Player inventory: {', '.join(self.player.inventory) if self.player.inventory else 'empty'}
-        {weapon_text}
-        
-        Generate a short, exciting fight outcome (2-3 sentences). 
-        Make it adventurous but not too violent.
-        """
+        fight_prompt = _FIGHT_TMPL.format_map({
+            'target': target,
+            'room_name': current_room['name'],
+            'room_description': current_room['description'],
+            'inventory': self.player.get_inventory_csv() or 'empty',
+            'weapon_text': weapon_text
+        })
         
-        ai_response = self.ollama_client.generate_response(fight_prompt)
+        return self._stream_fight(target, fight_prompt)
+    
+    def _stream_fight(self, target, fight_prompt):
+        """Yield the AI fight outcome as it is generated"""
+        chunks = []
+        try:
+            for chunk in self.ollama_client.stream_response(fight_prompt):
+                if not chunks:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    yield "⚔️ "
+                chunks.append(chunk)
+                yield chunk
+                
+        except Exception as e:
+            # Runs after _execute_command has returned, so report errors the same way here
+            self.logger.log(f"Command execution error: {str(e)}")
+            error = f"❌ Error executing command: {str(e)}"
+            yield f"\n{error}" if chunks else error
+            return
         
-        if ai_response:
-            self.logger.log(f"Fight with {target}: {ai_response}")
-            return f"⚔️ {ai_response}"
+        if chunks:
+            self.logger.log(f"Fight with {target}: {''.join(chunks).strip()}")
         else:
-            return f"⚔️ You engage the {target} in combat! The battle is fierce but you emerge victorious!"
+            yield f"⚔️ You engage the {target} in combat! The battle is fierce but you emerge victorious!"
     
     def _show_room_description(self):
         """Show current room description"""
@@ -253,36 +321,4 @@ class GameEngine:
     
     def show_help(self):
         """Show help information"""
-        help_text = """
-🎮 GAME COMMANDS:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-📍 LOOK (l)          - Look around current room
-   look <direction>  - Look in specific direction (n/s/e/w)
-
-🚶 MOVE (m)          - Move in a direction
-   move <direction>  - Move north/south/east/west (n/s/e/w)
-
-🤏 GRAB (g)          - Pick up an item
-   grab <item>       - Grab specific item
-
-🎒 INVENTORY (i)     - Show your inventory
-
-🔧 USE (u)           - Use an item from inventory
-   use <item>        - Use specific item
-
-🔍 EXAMINE (x)       - Examine an item in detail
-   examine <item>    - Get detailed item information
-
-⚔️ FIGHT (f)         - Fight an enemy
-   fight <enemy>     - Fight specific enemy
-
-❓ HELP (h)          - Show this help
-🚪 QUIT (q)          - Exit game
-
-💡 TIP: You can use abbreviations! 
-   'm n' = 'move north', 'l e' = 'look east', etc.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-        """
-        print(help_text)
\ No newline at end of file
+        print(_HELP_TEXT)
\ No newline at end of file
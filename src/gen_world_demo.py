@@ -0,0 +1,21 @@
+"""
+Example world generation run against a local LM Studio server
+"""
+
+from world_generator import WorldGenerator
+
+def main():
+    """Generate a sample world and save it to JSON"""
+    generator = WorldGenerator()
+    new_world = generator.generate_world_data(
+        world_theme="an alien jungle planet",
+        rooms_to_generate=4
+    )
+
+    if new_world:
+        print("\n--- Generated World Data ---")
+        print(f"Number of rooms: {len(new_world.rooms)}")
+        generator.save_world_to_json()
+
+if __name__ == "__main__":
+    main()
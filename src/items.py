@@ -4,8 +4,11 @@ Item definitions and management system
 
 class Item:
     """Base item class"""
+    __slots__ = ('name', 'name_lower', 'description', 'value', 'usable', 'consumable')
+    
     def __init__(self, name, description, value=0, usable=False, consumable=False):
         self.name = name
+        self.name_lower = name.lower()
         self.description = description
         self.value = value
         self.usable = usable
@@ -22,6 +25,8 @@ class Item:
 
 class Weapon(Item):
     """Weapon item class"""
+    __slots__ = ('damage',)
+    
     def __init__(self, name, description, damage, value=0):
         super().__init__(name, description, value, usable=True)
         self.damage = damage
@@ -31,6 +36,8 @@ class Weapon(Item):
 
 class ConsumableItem(Item):
     """Consumable item class"""
+    __slots__ = ('effect_type', 'effect_value')
+    
     def __init__(self, name, description, effect_type, effect_value, value=0):
         super().__init__(name, description, value, usable=True, consumable=True)
         self.effect_type = effect_type  # 'health', 'mana', etc.
@@ -134,13 +141,17 @@ class ItemManager:
         """Get item by name"""
         return self.items.get(item_name.lower())
     
+    def get_item_exact(self, key):
+        """Get item by already-lowercased name"""
+        return self.items.get(key)
+    
     def get_all_items(self):
         """Get all items"""
         return self.items
     
     def add_item(self, item):
         """Add new item to the manager"""
-        self.items[item.name.lower()] = item
+        self.items[item.name_lower] = item
     
     def item_exists(self, item_name):
         """Check if item exists"""
@@ -155,10 +166,10 @@ class ItemManager:
         desc = f"📦 {item.name.title()}\n"
         desc += f"📝 {item.description}\n"
         
-        if hasattr(item, 'damage'):
+        if isinstance(item, Weapon):
             desc += f"⚔️ Damage: {item.damage}\n"
         
-        if hasattr(item, 'effect_value'):
+        if isinstance(item, ConsumableItem):
             desc += f"💚 Restores: {item.effect_value} {item.effect_type}\n"
         
         if item.value > 0:
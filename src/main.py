@@ -5,17 +5,36 @@ Main entry point for the Docker Adventure Game
 
 import sys
 import signal
-import time
-from pathlib import Path
 
 from game_engine import GameEngine
 from utils import Logger
 
+_PROMPT = "\n> "
+
+_BANNER = (
+    "\n" + "=" * 50 + "\n"
+    "    🏰 WELCOME TO DOCKER ADVENTURE GAME 🏰\n"
+    + "=" * 50 + "\n"
+    "Type 'help' for commands or 'quit' to exit\n"
+    "Commands support abbreviations (e.g., 'm n' for 'move north')\n"
+    + "-" * 50 + "\n"
+)
+
 def signal_handler(sig, frame):
     """Handle graceful shutdown"""
     print("\n\nGame shutting down gracefully...")
     sys.exit(0)
 
+def print_streamed(chunks):
+    """Print chunks as they arrive and return the full text"""
+    parts = []
+    for chunk in chunks:
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+        parts.append(chunk)
+    sys.stdout.write("\n")
+    return "".join(parts)
+
 def main():
     """Main game loop"""
     # Set up signal handler
@@ -32,18 +51,22 @@ def main():
         game = GameEngine(logger)
         
         # Welcome message
-        print("\n" + "="*50)
-        print("    🏰 WELCOME TO DOCKER ADVENTURE GAME 🏰")
-        print("="*50)
-        print("Type 'help' for commands or 'quit' to exit")
-        print("Commands support abbreviations (e.g., 'm n' for 'move north')")
-        print("-"*50)
+        sys.stdout.write(_BANNER)
         
         # Main game loop
         while True:
             try:
                 # Get user input
-                user_input = input("\n> ").strip()
+                sys.stdout.write(_PROMPT)
+                sys.stdout.flush()
+                line = sys.stdin.readline()
+                
+                if not line:
+                    # End of input stream
+                    logger.log("Input closed, ending game")
+                    break
+                    
+                user_input = line.strip()
                 
                 if not user_input:
                     continue
@@ -61,11 +84,15 @@ def main():
                     break
                 elif result == "HELP":
                     game.show_help()
-                else:
+                elif isinstance(result, str):
                     # Print command result
                     if result:
-                        print(result)
+                        sys.stdout.write(result + "\n")
                         logger.log(f"Command result: {result}")
+                elif result is not None:
+                    # Streamed command result
+                    result = print_streamed(result)
+                    logger.log(f"Command result: {result}")
                         
             except KeyboardInterrupt:
                 print("\n\nUse 'quit' to exit gracefully.")
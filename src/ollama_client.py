@@ -5,6 +5,10 @@ Ollama client for AI-powered responses
 import requests
 import json
 import os
+import time
+
+# Seconds to reuse the last health check result
+AVAILABILITY_TTL = 5.0
 
 class OllamaClient:
     def __init__(self, logger):
@@ -12,49 +16,74 @@ class OllamaClient:
         self.host = os.getenv('OLLAMA_HOST', 'localhost:11434')
         self.model = 'gemma2'
         self.base_url = f"http://{self.host}"
+        self._url = f"{self.base_url}/api/generate"
+        
+        # Reuse one keep-alive connection for all requests
+        self._session = requests.Session()
+        
+        # Pre-encoded static payload parts; only the prompt and token limit vary
+        model = json.dumps(self.model).encode()
+        self._payload_prefix = (b'{"model":' + model
+                                + b',"stream":true,"options":{"temperature":0.7,"num_predict":')
+        self._payload_mid = b'},"prompt":'
+        self._payload_suffix = b'}'
+        self._headers = {'Content-Type': 'application/json'}
+        
+        # (timestamp, result) of the last health check
+        self._avail_cached = (None, False)
+        
+    def _encode_payload(self, prompt, max_tokens):
+        """Splice the variable fields into the pre-encoded request payload"""
+        return (self._payload_prefix + str(int(max_tokens)).encode()
+                + self._payload_mid + json.dumps(prompt).encode() + self._payload_suffix)
+    
+    def stream_response(self, prompt, max_tokens=150):
+        """Generate AI response using Ollama, yielding text as it arrives"""
+        body = self._encode_payload(prompt, max_tokens)
+        
+        self.logger.log(f"Sending streaming request to Ollama: {prompt[:100]}...")
         
-    def generate_response(self, prompt, max_tokens=150):
-        """Generate AI response using Ollama"""
+        chunks = []
         try:
-            url = f"{self.base_url}/api/generate"
-            
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "num_predict": max_tokens,
-                    "temperature": 0.7
-                }
-            }
-            
-            self.logger.log(f"Sending request to Ollama: {prompt[:100]}...")
-            
-            response = requests.post(url, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result.get('response', '').strip()
-                self.logger.log(f"Ollama response: {ai_response[:100]}...")
-                return ai_response
-            else:
-                self.logger.log(f"Ollama error {response.status_code}: {response.text}")
-                return None
-                
+            with self._session.post(self._url, data=body, headers=self._headers,
+                                    stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    self.logger.log(f"Ollama error {response.status_code}: {response.text}")
+                    return
+                    
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    text = chunk.get('response', '')
+                    if text:
+                        chunks.append(text)
+                        yield text
+                    if chunk.get('done'):
+                        break
+                        
         except requests.exceptions.ConnectionError:
             self.logger.log("Cannot connect to Ollama service")
-            return None
         except requests.exceptions.Timeout:
             self.logger.log("Ollama request timed out")
-            return None
         except Exception as e:
             self.logger.log(f"Ollama client error: {str(e)}")
-            return None
+            
+        if chunks:
+            self.logger.log(f"Ollama response: {''.join(chunks).strip()[:100]}...")
     
     def is_available(self):
         """Check if Ollama service is available"""
+        now = time.monotonic()
+        checked_at, available = self._avail_cached
+        if checked_at is not None and now - checked_at < AVAILABILITY_TTL:
+            return available
+            
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
+            available = response.status_code == 200
         except:
-            return False
\ No newline at end of file
+            available = False
+            
+        self._avail_cached = (now, available)
+        return available
\ No newline at end of file
@@ -6,25 +6,42 @@ class Player:
     def __init__(self):
         self.name = "Adventurer"
         self.current_room = None
-        self.inventory = []
+        self.inventory = {}  # Item name -> count
+        self._inventory_names = {}  # Lowercase name -> inventory key
+        self._inventory_csv = None  # Memoized comma-separated inventory
         self.health = 100
         self.experience = 0
         self.level = 1
     
     def add_item(self, item):
         """Add item to inventory"""
-        self.inventory.append(item)
+        self.inventory[item] = self.inventory.get(item, 0) + 1
+        self._inventory_names[item.lower()] = item
+        self._inventory_csv = None
     
     def remove_item(self, item):
         """Remove item from inventory"""
-        if item in self.inventory:
-            self.inventory.remove(item)
-            return True
-        return False
+        key = self._inventory_names.get(item.lower())
+        if key is None:
+            return False
+            
+        if self.inventory[key] > 1:
+            self.inventory[key] -= 1
+        else:
+            del self.inventory[key]
+            del self._inventory_names[item.lower()]
+            self._inventory_csv = None
+        return True
     
     def has_item(self, item):
         """Check if player has item"""
-        return item in self.inventory
+        return item.lower() in self._inventory_names
+    
+    def get_inventory_csv(self):
+        """Get inventory as a comma-separated string"""
+        if self._inventory_csv is None:
+            self._inventory_csv = ', '.join(self.inventory)
+        return self._inventory_csv
     
     def get_status(self):
         """Get player status"""
@@ -33,5 +50,5 @@ class Player:
             "health": self.health,
             "level": self.level,
             "experience": self.experience,
-            "inventory_count": len(self.inventory)
+            "inventory_count": sum(self.inventory.values())
         }
\ No newline at end of file
@@ -2,54 +2,103 @@
 Utility functions and helpers
 """
 
+import atexit
 import os
-from datetime import datetime
-from pathlib import Path
+import textwrap
+import threading
+import time
+import weakref
+
+# Buffered log entries are written out after this many entries or seconds
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 5.0
+
+# Open loggers, closed together at exit without being kept alive until then
+_live_loggers = weakref.WeakSet()
+
+def _close_loggers():
+    """Close every logger still open at interpreter exit"""
+    for logger in list(_live_loggers):
+        logger.close()
+
+atexit.register(_close_loggers)
 
 class Logger:
+    # Log directories already created by this process
+    _dir_ready = set()
+    
     def __init__(self):
         self.log_file = os.getenv('GAME_LOG_FILE', '/app/shared/game.log')
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_sec = None  # Second the cached timestamp was formatted for
+        self._last_ts = ""
         self.ensure_log_dir()
+        
+        # Keep one file handle open for the life of the logger
+        try:
+            self._fh = open(self.log_file, 'a', buffering=1 << 16, encoding='utf-8')
+        except Exception as e:
+            print(f"Logging error: {e}")
+            self._fh = None
+        _live_loggers.add(self)
+    
+    def __del__(self):
+        """Write out anything still buffered when the logger is discarded"""
+        self.close()
     
     def ensure_log_dir(self):
-        """Ensure log directory exists"""
-        log_path = Path(self.log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        """Ensure log directory exists, checking each directory once per process"""
+        log_dir = os.path.dirname(self.log_file)
+        if log_dir and log_dir not in Logger._dir_ready:
+            os.makedirs(log_dir, exist_ok=True)
+            Logger._dir_ready.add(log_dir)
     
     def log(self, message):
         """Log message to file and optionally to console"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
+        sec = int(time.time())
+        if sec != self._last_sec:
+            self._last_ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._last_sec = sec
+        log_entry = f"[{self._last_ts}] {message}"
         
-        # Write to file
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry + '\n')
-        except Exception as e:
-            print(f"Logging error: {e}")
+        # Buffer for file, writing out in batches
+        with self._lock:
+            self._buffer.append(log_entry + '\n')
+            if (len(self._buffer) >= FLUSH_EVERY
+                    or time.monotonic() - self._last_flush >= FLUSH_INTERVAL):
+                self._flush_locked()
         
         # Also print debug info (optional)
         if os.getenv('DEBUG', '').lower() == 'true':
             print(f"DEBUG: {log_entry}")
-
-def format_text(text, width=70):
-    """Format text to specified width"""
-    words = text.split()
-    lines = []
-    current_line = ""
     
-    for word in words:
-        if len(current_line + " " + word) <= width:
-            if current_line:
-                current_line += " " + word
-            else:
-                current_line = word
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
+    def flush(self):
+        """Write buffered log entries to file"""
+        with self._lock:
+            self._flush_locked()
     
-    if current_line:
-        lines.append(current_line)
+    def close(self):
+        """Flush buffered log entries and close the log file"""
+        with self._lock:
+            self._flush_locked()
+            if self._fh:
+                self._fh.close()
+                self._fh = None
     
-    return '\n'.join(lines)
\ No newline at end of file
+    def _flush_locked(self):
+        """Write buffered log entries; caller must hold the lock"""
+        if self._buffer and self._fh:
+            try:
+                self._fh.writelines(self._buffer)
+                self._fh.flush()
+            except Exception as e:
+                print(f"Logging error: {e}")
+        self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+def format_text(text, width=70):
+    """Format text to specified width"""
+    return '\n'.join(textwrap.wrap(' '.join(text.split()), width=width,
+                                   break_long_words=False, break_on_hyphens=False))
\ No newline at end of file
@@ -2,71 +2,114 @@
 World definition and room management
 """
 
+import types
+
+# Read-only room returned for unknown IDs, shared so misses allocate nothing
+_EMPTY_ROOM = types.MappingProxyType({})
+
+# Built once at import and shared by all World instances
+_DEFAULT_ROOMS = {
+    "forest_entrance": {
+        "name": "Forest Entrance",
+        "description": "You stand at the edge of a mysterious forest. Ancient trees tower above you, their branches creating a canopy that filters the sunlight into dancing patterns on the forest floor.",
+        "short_desc": "The entrance to a mysterious forest",
+        "exits": {
+            "north": "forest_path",
+            "east": "old_well"
+        },
+        "items": ["stick", "stone"],
+        "enemies": []
+    },
+    "forest_path": {
+        "name": "Forest Path",
+        "description": "A winding path leads deeper into the forest. You hear the distant sound of running water and the rustling of small creatures in the underbrush.",
+        "short_desc": "A winding forest path",
+        "exits": {
+            "south": "forest_entrance",
+            "north": "forest_clearing",
+            "west": "dark_cave"
+        },
+        "items": ["berries"],
+        "enemies": ["forest sprite"]
+    },
+    "old_well": {
+        "name": "Old Well",
+        "description": "An ancient stone well sits in a small clearing. Moss covers its weathered stones, and a rusty bucket hangs from a frayed rope. The well seems to whisper secrets of ages past.",
+        "short_desc": "An ancient stone well",
+        "exits": {
+            "west": "forest_entrance",
+            "north": "forest_clearing"
+        },
+        "items": ["rope", "coin"],
+        "enemies": []
+    },
+    "forest_clearing": {
+        "name": "Forest Clearing",
+        "description": "A beautiful clearing opens up before you, bathed in golden sunlight. Wildflowers bloom in abundance, and butterflies dance among them. This feels like a place of peace and magic.",
+        "short_desc": "A peaceful forest clearing",
+        "exits": {
+            "south": "forest_path",
+            "east": "old_well",
+            "west": "dark_cave"
+        },
+        "items": ["flowers", "crystal"],
+        "enemies": []
+    },
+    "dark_cave": {
+        "name": "Dark Cave",
+        "description": "The cave entrance yawns before you like a hungry mouth. Cool, damp air flows from within, carrying strange echoes and the scent of earth and mystery.",
+        "short_desc": "A dark, mysterious cave",
+        "exits": {
+            "east": "forest_path",
+            "south": "forest_clearing"
+        },
+        "items": ["torch", "gem"],
+        "enemies": ["cave troll"]
+    }
+}
+
 class World:
     def __init__(self):
-        self.rooms = {
-            "forest_entrance": {
-                "name": "Forest Entrance",
-                "description": "You stand at the edge of a mysterious forest. Ancient trees tower above you, their branches creating a canopy that filters the sunlight into dancing patterns on the forest floor.",
-                "short_desc": "The entrance to a mysterious forest",
-                "exits": {
-                    "north": "forest_path",
-                    "east": "old_well"
-                },
-                "items": ["stick", "stone"],
-                "enemies": []
-            },
-            "forest_path": {
-                "name": "Forest Path",
-                "description": "A winding path leads deeper into the forest. You hear the distant sound of running water and the rustling of small creatures in the underbrush.",
-                "short_desc": "A winding forest path",
-                "exits": {
-                    "south": "forest_entrance",
-                    "north": "forest_clearing",
-                    "west": "dark_cave"
-                },
-                "items": ["berries"],
-                "enemies": ["forest sprite"]
-            },
-            "old_well": {
-                "name": "Old Well",
-                "description": "An ancient stone well sits in a small clearing. Moss covers its weathered stones, and a rusty bucket hangs from a frayed rope. The well seems to whisper secrets of ages past.",
-                "short_desc": "An ancient stone well",
-                "exits": {
-                    "west": "forest_entrance",
-                    "north": "forest_clearing"
-                },
-                "items": ["rope", "coin"],
-                "enemies": []
-            },
-            "forest_clearing": {
-                "name": "Forest Clearing",
-                "description": "A beautiful clearing opens up before you, bathed in golden sunlight. Wildflowers bloom in abundance, and butterflies dance among them. This feels like a place of peace and magic.",
-                "short_desc": "A peaceful forest clearing",
-                "exits": {
-                    "south": "forest_path",
-                    "east": "old_well",
-                    "west": "dark_cave"
-                },
-                "items": ["flowers", "crystal"],
-                "enemies": []
-            },
-            "dark_cave": {
-                "name": "Dark Cave",
-                "description": "The cave entrance yawns before you like a hungry mouth. Cool, damp air flows from within, carrying strange echoes and the scent of earth and mystery.",
-                "short_desc": "A dark, mysterious cave",
-                "exits": {
-                    "east": "forest_path",
-                    "south": "forest_clearing"
-                },
-                "items": ["torch", "gem"],
-                "enemies": ["cave troll"]
-            }
-        }
+        # Share the static room data; only item lists change during play
+        self.rooms = {room_id: {**room, "items": list(room["items"])}
+                      for room_id, room in _DEFAULT_ROOMS.items()}
+        
+        # Per-room lookup indexes; room lists are kept for display order
+        self._exits = {}
+        self._items = {}
+        for room_id, room in self.rooms.items():
+            room_exits = room.get('exits', {})
+            self._exits[room_id] = tuple(direction for direction in ('north', 'south', 'east', 'west')
+                                         if room_exits.get(direction))
+            self._items[room_id] = {item.lower(): item for item in room.get('items', [])}
     
     def get_room(self, room_id):
         """Get room by ID"""
-        return self.rooms.get(room_id, {})
+        return self.rooms.get(room_id, _EMPTY_ROOM)
+    
+    def get_exits(self, room_id):
+        """Get the directions that lead out of a room"""
+        return self._exits.get(room_id, ())
+    
+    def find_item(self, room_id, item_name):
+        """Get the room's spelling of an item, matched case-insensitively"""
+        items = self._items.get(room_id)
+        return items.get(item_name.lower()) if items else None
+    
+    def has_item(self, room_id, item_name):
+        """Check if a room contains an item"""
+        return self.find_item(room_id, item_name) is not None
+    
+    def remove_item(self, room_id, item):
+        """Remove an item from a room"""
+        room_items = self.get_room(room_id).get('items', [])
+        if item not in room_items:
+            return False
+            
+        room_items.remove(item)
+        if item not in room_items:
+            self._items[room_id].pop(item.lower(), None)
+        return True
     
     def get_all_rooms(self):
         """Get all rooms"""
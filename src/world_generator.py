@@ -1,6 +1,243 @@
-import requests
+import hashlib
 import json
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_SYSTEM_PROMPT = """
+You are a highly-specialized AI assistant for generating data for text-based adventure games.
+Your task is to generate a JSON object representing the rooms of a game world.
+The output must be a single, complete, valid JSON object and nothing else. Do not include any conversational text, explanations, or code blocks.
+The top-level JSON object should have a single key, "rooms", which contains a dictionary of room objects.
+The room keys should be lowercase, using underscores instead of spaces (e.g., 'forest_entrance').
+"""
+
+_EXAMPLE_PROMPT_TEMPLATE = """
+The structure for each room must exactly match this example:
+{example}
+"""
+
+_USER_PROMPT_TEMPLATE = """
+Generate a JSON object for a game world with the theme: **{theme}**.
+The world should contain {rooms} rooms.
+"""
+
+# Room structure example used when the caller does not supply one
+_EXAMPLE_JSON = """
+{
+    "rooms": {
+        "forest_entrance": {
+            "name": "Forest Entrance",
+            "description": "You stand at the edge of a mysterious forest.",
+            "short_desc": "The entrance to a mysterious forest",
+            "exits": {
+                "north": "forest_path"
+            },
+            "items": ["stick"],
+            "enemies": []
+        }
+    }
+}
+"""
+
+# System message for the default example, built once
+_DEFAULT_SYSTEM_PROMPT = _SYSTEM_PROMPT + _EXAMPLE_PROMPT_TEMPLATE.format(example=_EXAMPLE_JSON)
+
+_BATCH_NOTE_TEMPLATE = """
+This is part {part} of {parts} of a larger world. Start every room key with "{prefix}" so keys stay unique across parts.
+"""
+
+_REPAIR_PROMPT_TEMPLATE = """
+That JSON does not match the required room structure: {error}.
+Reply with the corrected, complete JSON object only.
+"""
+
+# Generation attempts, including repair requests for invalid output
+MAX_GENERATION_ATTEMPTS = 2
+
+# Part of every cache key; bump when the prompts or room validation change
+_CACHE_VERSION = 3
+
+# Fields every generated room must have, with their expected types
+_ROOM_FIELDS = (
+    ("name", str, "string"),
+    ("description", str, "string"),
+    ("short_desc", str, "string"),
+    ("exits", dict, "object"),
+    ("items", list, "list"),
+    ("enemies", list, "list")
+)
+
+# Direction leading back the way each direction goes, for two-way exits
+_OPPOSITE_DIRECTIONS = {"north": "south", "south": "north", "east": "west", "west": "east"}
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _dumps(obj, indent=False):
+    """
+    Serializes obj to JSON bytes, using orjson when it is installed.
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+def _loads(data):
+    """
+    Parses JSON text or bytes, using orjson when it is installed.
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _parse_json_object(text):
+    """
+    Parses the first JSON object in text, skipping any code fences or
+    chatter the model wrapped around it.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+
+    # Fast path: the object runs up to the last closing brace
+    if orjson:
+        try:
+            return orjson.loads(text[start:text.rfind("}") + 1])
+        except orjson.JSONDecodeError:
+            pass
+
+    world_data, _ = _JSON_DECODER.raw_decode(text, start)
+    return world_data
+
+def _validate_world(world_data, room_count=None):
+    """
+    Checks generated world data against the room structure the game expects,
+    and against room_count when given, raising ValueError that describes the
+    first problem found.
+    """
+    rooms = world_data.get("rooms") if isinstance(world_data, dict) else None
+    if not isinstance(rooms, dict) or not rooms:
+        raise ValueError('expected a non-empty "rooms" object')
+    if room_count is not None and len(rooms) != room_count:
+        raise ValueError(f"expected {room_count} rooms, got {len(rooms)}")
+
+    for room_id, room in rooms.items():
+        if not isinstance(room, dict):
+            raise ValueError(f'room "{room_id}" is not an object')
+        for field, field_type, type_name in _ROOM_FIELDS:
+            if not isinstance(room.get(field), field_type):
+                raise ValueError(f'room "{room_id}" field "{field}" must be a {type_name}')
+        for direction, target in room["exits"].items():
+            if not isinstance(target, str):
+                raise ValueError(f'room "{room_id}" exits must map directions to room keys')
+            if target not in rooms:
+                raise ValueError(f'room "{room_id}" exit "{direction}" leads to unknown room "{target}"')
+        for field in ("items", "enemies"):
+            if not all(isinstance(value, str) for value in room[field]):
+                raise ValueError(f'room "{room_id}" {field} must be a list of strings')
+
+def _prefix_rooms(rooms, prefix):
+    """
+    Returns a copy of rooms whose keys and exit targets all start with
+    prefix, adding it wherever the model left it out.
+    """
+    def prefixed(room_id):
+        return room_id if room_id.startswith(prefix) else prefix + room_id
+
+    prefixed_rooms = {
+        prefixed(room_id): {**room, "exits": {direction: prefixed(target)
+                                              for direction, target in room["exits"].items()}}
+        for room_id, room in rooms.items()
+    }
+    if len(prefixed_rooms) != len(rooms):
+        raise ValueError(f'room keys collide after adding the "{prefix}" prefix')
+    return prefixed_rooms
+
+def _link_rooms(rooms, from_ids, to_ids):
+    """
+    Adds a two-way exit between the first room in from_ids and the first
+    room in to_ids that have a free direction and its opposite.
+    """
+    for from_id in from_ids:
+        from_exits = rooms[from_id]["exits"]
+        for direction, opposite in _OPPOSITE_DIRECTIONS.items():
+            if direction in from_exits:
+                continue
+            for to_id in to_ids:
+                to_exits = rooms[to_id]["exits"]
+                if opposite not in to_exits:
+                    from_exits[direction] = to_id
+                    to_exits[opposite] = from_id
+                    return
+    raise ValueError(f'no free exits to link rooms "{from_ids[0]}" and "{to_ids[0]}"')
+
+def _atomic_write(path, data):
+    """
+    Writes bytes to path through a temp file in the same directory, so
+    readers never see a partially written file.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class _ObjectEndTracker:
+    """
+    Follows brace depth across streamed text to spot where the first
+    top-level JSON object ends.
+    """
+    __slots__ = ("depth", "started", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text):
+        """
+        Consumes the next piece of text; returns True once the object has closed.
+        """
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.started
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+@dataclass(slots=True)
+class GeneratedWorld:
+    """
+    Rooms produced by the generator or loaded from a saved file.
+    """
+    rooms: dict
 
 class WorldGenerator:
     """
@@ -9,70 +246,170 @@ class WorldGenerator:
 
     def __init__(self, api_url="http://localhost:1234/v1/chat/completions"):
         self.api_url = api_url
-        self.headers = {"Content-Type": "application/json"}
+        self.model = "YOUR_MODEL_NAME_HERE" # Replace with your specific model name
+        self.temperature = 0.7
         self.generated_world = None
+        self._cache_dir = Path(os.getenv("WORLDGEN_CACHE", "/app/shared/worldcache"))
+
+        # Reuse one keep-alive connection across generations
+        self._session = None  # Created on first request; see _get_session
 
-    def _create_prompt(self, world_theme, rooms_to_generate, example_json_structure):
+    def _create_prompt(self, world_theme, rooms_to_generate, example_json_structure, batch_note=""):
         """
-        Constructs the system and user prompts to request JSON output.
+        Constructs the chat messages requesting JSON output. The example ends
+        the system message, so every request for the same structure shares a
+        prompt prefix the server can reuse.
         """
-        system_prompt = f"""
-        You are a highly-specialized AI assistant for generating data for text-based adventure games.
-        Your task is to generate a JSON object representing the rooms of a game world.
-        The output must be a single, complete, valid JSON object and nothing else. Do not include any conversational text, explanations, or code blocks.
-        The top-level JSON object should have a single key, "rooms", which contains a dictionary of room objects.
-        The room keys should be lowercase, using underscores instead of spaces (e.g., 'forest_entrance').
+        if example_json_structure is _EXAMPLE_JSON:
+            system_prompt = _DEFAULT_SYSTEM_PROMPT
+        else:
+            system_prompt = _SYSTEM_PROMPT + _EXAMPLE_PROMPT_TEMPLATE.format(example=example_json_structure)
+        user_prompt = _USER_PROMPT_TEMPLATE.format(theme=world_theme, rooms=rooms_to_generate)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt + batch_note}
+        ]
+
+    def _get_session(self):
+        """
+        Returns the keep-alive HTTP session, importing requests on first use.
+        """
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({"Content-Type": "application/json"})
+        return self._session
+
+    def _cache_key(self, world_theme, rooms_to_generate, example_json_structure, batch_note=""):
+        """
+        Hashes everything that shapes a generation into a cache key.
+        """
+        key_data = [_CACHE_VERSION, self.model, world_theme, rooms_to_generate,
+                    example_json_structure, self.temperature]
+        if batch_note:
+            key_data.append(batch_note)
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def _read_cache(self, cache_key):
         """
-        
-        user_prompt = f"""
-        Generate a JSON object for a game world with the theme: **{world_theme}**.
-        The world should contain {rooms_to_generate} rooms.
-        The structure for each room must exactly match this example:
-        {example_json_structure}
+        Returns cached world data for the key, or None on a miss.
         """
+        cache_file = self._cache_dir / f"{cache_key}.json"
+        try:
+            with open(cache_file, "rb") as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable cache entry {cache_file}: {e}")
+            return None
 
-        return system_prompt, user_prompt
+    def _write_cache(self, cache_key, world_data):
+        """
+        Stores world data under the key, replacing any old entry atomically.
+        """
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self._cache_dir / f"{cache_key}.json", _dumps(world_data))
+        except OSError as e:
+            print(f"Could not write world cache: {e}")
 
-    def generate_world_data(self, world_theme, rooms_to_generate, example_json_structure):
+    def _request_world_data(self, world_theme, rooms_to_generate, example_json_structure, batch_note=""):
         """
-        Calls the LM Studio API to generate the world data as a JSON string.
+        Calls the LM Studio API and parses the generated world data, asking
+        the model to repair output that does not match the room structure.
         """
         print("Generating new world data as JSON with LM Studio...")
-        system_prompt, user_prompt = self._create_prompt(world_theme, rooms_to_generate, example_json_structure)
+        messages = self._create_prompt(world_theme, rooms_to_generate, example_json_structure, batch_note)
 
+        for attempt in range(1, MAX_GENERATION_ATTEMPTS + 1):
+            generated_json_string = self._request_completion(messages)
+
+            # --- Attempt to parse and validate the JSON string ---
+            print("Parsing generated JSON data...")
+            try:
+                world_data = _parse_json_object(generated_json_string)
+                # Batches must come back at exactly the requested size
+                _validate_world(world_data, rooms_to_generate if batch_note else None)
+                return world_data
+            except ValueError as e:
+                if attempt == MAX_GENERATION_ATTEMPTS:
+                    raise
+                print(f"Generated world data is invalid ({e}), asking the model to repair it...")
+                messages = messages + [
+                    {"role": "assistant", "content": generated_json_string},
+                    {"role": "user", "content": _REPAIR_PROMPT_TEMPLATE.format(error=e)}
+                ]
+
+    def _request_completion(self, messages):
+        """
+        Sends a chat completion request and returns the generated text.
+        """
         payload = {
-            "model": "YOUR_MODEL_NAME_HERE", # Replace with your specific model name
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": 0.7,
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
             "max_tokens": 2000,
-            "stream": False
+            "stream": True
         }
 
-        try:
-            response = requests.post(self.api_url, headers=self.headers, data=json.dumps(payload))
+        with self._get_session().post(self.api_url, data=_dumps(payload), stream=True, timeout=60) as response:
             response.raise_for_status()
-            generated_json_string = response.json()["choices"][0]["message"]["content"]
-            
-            # --- Attempt to clean and parse the JSON string ---
-            print("Parsing generated JSON data...")
-            # Some models might wrap the JSON in markdown code blocks
-            if generated_json_string.startswith("```json"):
-                generated_json_string = generated_json_string.split("```json")[1]
-            if generated_json_string.endswith("```"):
-                generated_json_string = generated_json_string.rsplit("```", 1)[0]
-
-            # Attempt to load the JSON string into a Python dictionary
-            world_data = json.loads(generated_json_string)
-            
-            # Now we can create the World class and instance
-            class World:
-                def __init__(self, rooms):
-                    self.rooms = rooms
-            
-            self.generated_world = World(world_data.get("rooms", {}))
+            if "text/event-stream" in response.headers.get("Content-Type", ""):
+                return self._read_stream(response)
+            # Server ignored the stream flag and sent one complete body
+            return _loads(response.content)["choices"][0]["message"]["content"]
+
+    def _read_stream(self, response):
+        """
+        Collects streamed completion text, stopping once the JSON object closes.
+        """
+        parts = []
+        tracker = _ObjectEndTracker()
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            content = _loads(data)["choices"][0]["delta"].get("content")
+            if content:
+                parts.append(content)
+                if tracker.feed(content):
+                    break
+        return "".join(parts)
+
+    def _generate_rooms(self, world_theme, rooms_to_generate, example_json_structure, batch_note=""):
+        """
+        Returns generated rooms, reusing a cached result for identical requests
+        as long as it still passes validation.
+        """
+        cache_key = self._cache_key(world_theme, rooms_to_generate, example_json_structure, batch_note)
+        world_data = self._read_cache(cache_key)
+        if world_data is not None:
+            try:
+                _validate_world(world_data, rooms_to_generate if batch_note else None)
+                print("Loaded world data from cache.")
+            except ValueError as e:
+                print(f"Ignoring invalid cache entry: {e}")
+                world_data = None
+
+        if world_data is None:
+            world_data = self._request_world_data(
+                world_theme, rooms_to_generate, example_json_structure, batch_note
+            )
+            self._write_cache(cache_key, world_data)
+        return world_data["rooms"]
+
+    def _create_world(self, generate):
+        """
+        Runs a room generation callable and stores the resulting world,
+        reporting any failure and leaving no world behind.
+        """
+        import requests
+
+        try:
+            self.generated_world = GeneratedWorld(rooms=generate())
             print("World object created successfully from JSON.")
 
         except requests.exceptions.RequestException as e:
@@ -81,6 +418,9 @@ class WorldGenerator:
         except json.JSONDecodeError as e:
             print(f"Error parsing generated JSON: {e}")
             self.generated_world = None
+        except ValueError as e:
+            print(f"Generated world data is invalid: {e}")
+            self.generated_world = None
         except KeyError as e:
             print(f"Error accessing key in API response: {e}")
             self.generated_world = None
@@ -90,12 +430,58 @@ class WorldGenerator:
 
         return self.generated_world
 
+    def generate_world_data(self, world_theme, rooms_to_generate, example_json_structure=_EXAMPLE_JSON):
+        """
+        Generates the world data, reusing a cached result for identical requests.
+        """
+        return self._create_world(
+            lambda: self._generate_rooms(world_theme, rooms_to_generate, example_json_structure)
+        )
+
+    def generate_world_data_batched(self, world_theme, rooms_to_generate, example_json_structure=_EXAMPLE_JSON,
+                                    batch_size=4, max_workers=4):
+        """
+        Generates a larger world as several smaller requests run in parallel.
+        Each batch's room keys get their own prefix, neighbouring batches are
+        joined by a two-way exit, and the merged world is validated as a whole.
+        """
+        counts = [min(batch_size, rooms_to_generate - start)
+                  for start in range(0, rooms_to_generate, batch_size)]
+        prefixes = [f"part{part}_" for part in range(1, len(counts) + 1)]
+        notes = [_BATCH_NOTE_TEMPLATE.format(part=part, parts=len(counts), prefix=prefix)
+                 for part, prefix in enumerate(prefixes, 1)]
+
+        def generate():
+            self._get_session()  # Create the shared session before the workers start
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batches = list(executor.map(
+                    lambda count, note: self._generate_rooms(world_theme, count, example_json_structure, note),
+                    counts, notes
+                ))
+
+            rooms = {}
+            batch_ids = []
+            for count, prefix, batch_rooms in zip(counts, prefixes, batches):
+                if len(batch_rooms) != count:
+                    raise ValueError(f'batch "{prefix}" has {len(batch_rooms)} rooms, expected {count}')
+                batch_rooms = _prefix_rooms(batch_rooms, prefix)
+                rooms.update(batch_rooms)
+                batch_ids.append(list(batch_rooms))
+
+            # Chain each batch to the next so the world is one connected map
+            for from_ids, to_ids in zip(batch_ids, batch_ids[1:]):
+                _link_rooms(rooms, from_ids, to_ids)
+
+            _validate_world({"rooms": rooms}, rooms_to_generate)
+            return rooms
+
+        return self._create_world(generate)
+
     def save_world_to_json(self, filename="generated_world.json"):
         """Saves the rooms dictionary of the generated world to a JSON file."""
         if self.generated_world:
             try:
-                with open(filename, "w") as f:
-                    json.dump(self.generated_world.rooms, f, indent=4)
+                _atomic_write(filename, _dumps(self.generated_world.rooms, indent=True))
                 print(f"World data successfully saved to {filename}")
             except Exception as e:
                 print(f"An error occurred while saving the file: {e}")
@@ -105,47 +491,12 @@ class WorldGenerator:
     def load_world_from_json(self, filename="generated_world.json"):
         """Loads world data from a JSON file and creates a new World object."""
         try:
-            with open(filename, "r") as f:
-                rooms_data = json.load(f)
-            
-            class World:
-                def __init__(self, rooms):
-                    self.rooms = rooms
-            
-            self.generated_world = World(rooms_data)
+            with open(filename, "rb") as f:
+                rooms_data = _loads(f.read())
+
+            self.generated_world = GeneratedWorld(rooms=rooms_data)
             print(f"World data successfully loaded from {filename}")
             return self.generated_world
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading file: {e}")
             return None
-
-# --- Example Usage ---
-if __name__ == "__main__":
-    example_json = """
-    {
-        "rooms": {
-            "forest_entrance": {
-                "name": "Forest Entrance",
-                "description": "You stand at the edge of a mysterious forest.",
-                "short_desc": "The entrance to a mysterious forest",
-                "exits": {
-                    "north": "forest_path"
-                },
-                "items": ["stick"],
-                "enemies": []
-            }
-        }
-    }
-    """
-
-    generator = WorldGenerator()
-    new_world = generator.generate_world_data(
-        world_theme="an alien jungle planet",
-        rooms_to_generate=4,
-        example_json_structure=example_json
-    )
-
-    if new_world:
-        print("\n--- Generated World Data ---")
-        print(f"Number of rooms: {len(new_world.rooms)}")
-        generator.save_world_to_json()
\ No newline at end of file